@@ -5,11 +5,382 @@
 JSON 파일로부터 HTML 템플릿을 사용하여 견적서를 PDF로 변환합니다.
 """
 
+import hashlib
 import json
 import os
+import re
+import traceback
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound, select_autoescape
 from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json 사용
+    orjson = None
+
+try:
+    from reportlab.lib.colors import HexColor, white
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.pdfgen import canvas
+except ImportError:  # reportlab 렌더러를 지정한 템플릿에서만 필요
+    canvas = None
+
+
+# 문서 타입 목록 (견적서, 거래명세서)
+DOC_TITLES = ['견 적 서', '거 래 명 세 서']
+
+# JSON 데이터를 동시에 읽는 스레드 수
+PREFETCH_WORKERS = 4
+
+# 템플릿 및 컴파일된 템플릿 바이트코드 캐시 디렉토리 (스크립트 위치 기준, 프로세스/실행 간 공유)
+BASE_DIR = Path(__file__).resolve().parent
+TEMPLATE_DIR = BASE_DIR / 'template'
+JINJA_CACHE_DIR = BASE_DIR / '.jinja_cache'
+
+# 프로세스 내에서 공유하는 템플릿 환경 (처음 사용할 때 생성)
+_env = None
+
+
+class _SourceRecordingLoader(FileSystemLoader):
+    """컴파일에 사용된 템플릿 소스를 기록하는 로더 (auto_reload=False이므로 디스크가 바뀌어도 컴파일된 소스와 일치)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sources = {}
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        self.sources[template] = source
+        return source, filename, uptodate
+
+
+def _get_environment():
+    """템플릿 환경 반환 (처음 호출 시 바이트코드 캐시와 함께 생성)"""
+    global _env
+    if _env is None:
+        try:
+            JINJA_CACHE_DIR.mkdir(exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(JINJA_CACHE_DIR), '%s.cache')
+        except OSError:
+            bytecode_cache = None  # 캐시 디렉토리를 만들 수 없으면 캐시 없이 컴파일
+        _env = Environment(
+            loader=_SourceRecordingLoader(str(TEMPLATE_DIR), encoding='utf-8'),
+            bytecode_cache=bytecode_cache,
+            autoescape=select_autoescape(['html']),
+            auto_reload=False,
+        )
+    return _env
+
+
+# PDF 레이아웃에 필요 없는 외부 스타일시트 (렌더링 시 제외)
+PDF_EXCLUDED_CSS = re.compile(r'bootstrap|font-?awesome', re.IGNORECASE)
+
+# write_pdf 옵션: 견적서(이미지 없음, 내부용 PDF)에 필요 없는 처리는 끔
+PDF_OPTIONS = {
+    'optimize_images': False,
+    'presentational_hints': False,
+    'uncompressed_pdf': False,
+    'pdf_variant': None,
+    'pdf_version': '1.7',
+}
+
+_STYLESHEET_LINK_RE = re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*>', re.IGNORECASE)
+_HREF_RE = re.compile(r'\bhref="([^"]+)"')
+
+
+def _strip_excluded_stylesheets(html_content):
+    """HTML에서 PDF_EXCLUDED_CSS에 해당하는 스타일시트 <link> 태그만 제거 (나머지는 WeasyPrint가 처리)"""
+    def replace(match):
+        href = _HREF_RE.search(match.group(0))
+        if href and PDF_EXCLUDED_CSS.search(href.group(1)):
+            return ''
+        return match.group(0)
+
+    return _STYLESHEET_LINK_RE.sub(replace, html_content)
+
+
+_BODY_RE = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+
+# 결합된 HTML에서 각 서류의 시작을 표시하는 id (템플릿의 id와 겹치지 않도록 내부 전용 접두사 사용)
+_DOC_ANCHOR = '__estimate_doc_{}'
+_DOC_ANCHOR_RE = re.compile(r'__estimate_doc_(\d+)')
+
+
+def _combine_html(html_documents):
+    """여러 HTML 문서의 본문을 페이지 나눔으로 이어 붙여 하나의 HTML로 결합 (head는 첫 문서 사용)"""
+    bodies = []
+    for i, html_content in enumerate(html_documents):
+        match = _BODY_RE.search(html_content)
+        body = match.group(1) if match else html_content
+        # body의 위쪽 여백은 결합된 문서의 맨 앞에만 적용되므로, 두 번째 문서부터는
+        # 감싸는 div가 body 여백을 이어받아 단독 렌더링과 같은 위치에서 시작하도록 함
+        style = ' style="page-break-before: always; margin-top: inherit"' if i else ''
+        bodies.append(f'<div id="{_DOC_ANCHOR.format(i)}"{style}>{body}</div>')
+
+    first = html_documents[0]
+    match = _BODY_RE.search(first)
+    if not match:
+        return ''.join(bodies)
+    return first[:match.start(1)] + ''.join(bodies) + first[match.end(1):]
+
+
+# 천 단위 콤마 제거용 변환 테이블 및 콤마 포맷 함수
+_DEL_COMMA = str.maketrans('', '', ',')
+_fmt = "{:,}".format
+
+
+def _to_int(value):
+    """금액/수량 값을 정수로 변환 (문자열의 천 단위 콤마 제거)"""
+    if isinstance(value, str):
+        return int(value.translate(_DEL_COMMA))
+    if isinstance(value, float) and not value.is_integer():
+        # 소수 수량/금액은 잘라내지 않고 변환 실패로 처리
+        raise ValueError(f"정수가 아닌 값입니다: {value}")
+    return int(value)
+
+
+def _sum_totals(item_totals, tax_rate):
+    """품목 금액 목록으로 공급가액, 세액 합계, 품목별 세액 계산 (숫자 연산만 수행)"""
+    item_taxes = [int(total * tax_rate) for total in item_totals]
+    return sum(item_totals), sum(item_taxes), item_taxes
+
+
+class Renderer(ABC):
+    """PDF 렌더러 인터페이스 (템플릿별로 하나씩 생성되어 재사용)"""
+
+    @abstractmethod
+    def fingerprint(self):
+        """출력에 영향을 주는 렌더러 입력(템플릿 소스, 레이아웃 버전 등)을 bytes로 반환 (etag 계산용)"""
+
+    @abstractmethod
+    def render(self, template_data, output_path):
+        """템플릿 데이터로 PDF 파일 생성"""
+
+    def render_many(self, template_data_list, output_paths):
+        """여러 서류를 각각의 PDF 파일로 생성 (기본: 한 건씩 렌더링)"""
+        for template_data, output_path in zip(template_data_list, output_paths):
+            self.render(template_data, output_path)
+
+
+class WeasyPrintRenderer(Renderer):
+    """HTML 템플릿을 WeasyPrint로 변환하는 렌더러 (기본값)"""
+
+    def __init__(self, template, font_config):
+        self.template = template
+        self.font_config = font_config
+        # 컴파일된 템플릿과 같은 소스로 etag를 계산 (렌더링마다 파일을 다시 읽지 않음)
+        source = _get_environment().loader.sources[template.name]
+        self._fingerprint = b'weasyprint|' + source.encode('utf-8')
+
+    def fingerprint(self):
+        return self._fingerprint
+
+    def _to_html(self, html_content):
+        """렌더링된 HTML을 WeasyPrint HTML 객체로 변환"""
+        # PDF에 필요 없는 스타일시트 <link> 제거
+        return HTML(string=_strip_excluded_stylesheets(html_content))
+
+    def render(self, template_data, output_path):
+        # HTML 생성 후 PDF로 직접 변환 (HTML 파일 저장 안 함)
+        html = self._to_html(self.template.render(**template_data))
+        html.write_pdf(target=output_path, font_config=self.font_config, **PDF_OPTIONS)
+
+    def render_many(self, template_data_list, output_paths):
+        if len(template_data_list) == 1:
+            return self.render(template_data_list[0], output_paths[0])
+
+        # 모든 서류를 하나의 HTML로 결합하여 CSS 파싱과 레이아웃을 한 번만 수행
+        html_documents = [self.template.render(**template_data) for template_data in template_data_list]
+        html = self._to_html(_combine_html(html_documents))
+        document = html.render(font_config=self.font_config, **PDF_OPTIONS)
+
+        # 각 서류의 시작 페이지(서류 앵커 위치)를 기준으로 PDF 파일 분리
+        starts = {}
+        for page_index, page in enumerate(document.pages):
+            for anchor in page.anchors:
+                match = _DOC_ANCHOR_RE.fullmatch(anchor)
+                if match:
+                    starts.setdefault(int(match.group(1)), page_index)
+        missing = [i for i in range(len(template_data_list)) if i not in starts]
+        if missing:
+            raise RuntimeError(f"결합된 PDF에서 서류 시작 위치를 찾을 수 없습니다: {', '.join(_DOC_ANCHOR.format(i) for i in missing)}")
+        bounds = [starts[i] for i in range(len(template_data_list))] + [len(document.pages)]
+
+        for i, (template_data, output_path) in enumerate(zip(template_data_list, output_paths)):
+            document.metadata.title = template_data.get('title')
+            document.copy(document.pages[bounds[i]:bounds[i + 1]]).write_pdf(target=output_path, **PDF_OPTIONS)
+
+
+class ReportLabRenderer(Renderer):
+    """clean_gradient 레이아웃을 reportlab 캔버스에 직접 그리는 렌더러 (CSS 레이아웃 생략)"""
+
+    FONT = 'HYGothic-Medium'
+    PRIMARY = '#667eea'
+    SECONDARY = '#764ba2'
+    MIN_ROWS = 8
+    # 레이아웃 코드를 바꾸면 올려서 기존 PDF를 다시 생성하도록 함 (HTML 템플릿은 사용하지 않음)
+    LAYOUT_VERSION = 1
+
+    def __init__(self):
+        if self.FONT not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(UnicodeCIDFont(self.FONT))
+
+    def fingerprint(self):
+        return f"reportlab|{self.LAYOUT_VERSION}|{self.FONT}".encode('utf-8')
+
+    def render(self, template_data, output_path):
+        c = canvas.Canvas(output_path, pagesize=A4)
+        c.setTitle(template_data.get('title', ''))
+        page_width, page_height = A4
+        margin = 15 * mm
+        width = page_width - 2 * margin
+        y = page_height - margin
+
+        y = self._draw_header(c, template_data, margin, y, width)
+        y = self._draw_info_cards(c, template_data, margin, y - 6 * mm, width)
+        y = self._draw_items(c, template_data, margin, y - 6 * mm, width, page_height)
+        self._draw_total_box(c, template_data, margin, y - 5 * mm, width)
+
+        c.showPage()
+        c.save()
+
+    def _draw_header(self, c, data, x, y, width):
+        height = 24 * mm
+        c.setFillColor(HexColor(self.PRIMARY))
+        c.rect(x, y - height, width, height, stroke=0, fill=1)
+        c.setFillColor(white)
+        c.setFont(self.FONT, 26)
+        c.drawCentredString(x + width / 2, y - 12 * mm, data.get('title', ''))
+        c.setFont(self.FONT, 8)
+        c.drawCentredString(x + width / 2, y - 19 * mm, f"No. {data.get('doc_number', '')}    |    {data.get('date', '')}")
+        return y - height
+
+    def _draw_info_cards(self, c, data, x, y, width):
+        height = 34 * mm
+        card_width = (width - 4 * mm) / 2
+        cards = [
+            ('공급받는 자', data.get('receiver') or {}, self.PRIMARY),
+            ('공급자', data.get('supplier') or {}, self.SECONDARY),
+        ]
+        for i, (label, party, color) in enumerate(cards):
+            left = x + i * (card_width + 4 * mm)
+            c.setFillColor(HexColor('#f5f7fa'))
+            c.rect(left, y - height, card_width, height, stroke=0, fill=1)
+            c.setFillColor(HexColor(color))
+            c.rect(left, y - height, 1.4 * mm, height, stroke=0, fill=1)
+            c.setFont(self.FONT, 9)
+            c.drawString(left + 5 * mm, y - 6 * mm, label)
+            c.setFillColor(HexColor('#333333'))
+            c.setFont(self.FONT, 11)
+            c.drawString(left + 5 * mm, y - 12 * mm, str(party.get('name', '')))
+            c.setFillColor(HexColor('#666666'))
+            c.setFont(self.FONT, 8)
+            details = [
+                f"대표: {party.get('ceo', '')}",
+                f"등록번호: {party.get('reg_id', '')}",
+                f"주소: {party.get('address', '')}",
+                f"연락처: {party.get('contact', '')}",
+            ]
+            for j, line in enumerate(details):
+                c.drawString(left + 5 * mm, y - (17.5 + j * 4.5) * mm, line)
+        return y - height
+
+    def _draw_items(self, c, data, x, y, width, page_height):
+        # (제목, 너비 비율, 정렬)
+        columns = [
+            ('품명', 0.30, 'left'),
+            ('규격', 0.20, 'left'),
+            ('수량', 0.08, 'center'),
+            ('단가', 0.14, 'right'),
+            ('공급가액', 0.14, 'right'),
+            ('세액', 0.14, 'right'),
+        ]
+        row_height = 7 * mm
+        bottom = 15 * mm + 20 * mm  # 합계 행 및 총 합계 상자 공간
+
+        def draw_row(values, y, fill=None, color='#333333', header=False):
+            if fill:
+                c.setFillColor(HexColor(fill))
+                c.rect(x, y - row_height, width, row_height, stroke=0, fill=1)
+            c.setFillColor(white if header else HexColor(color))
+            c.setFont(self.FONT, 9)
+            left = x
+            for (_, ratio, align), value in zip(columns, values):
+                col_width = width * ratio
+                text = str(value)
+                baseline = y - row_height + 2.4 * mm
+                if header or align == 'center':
+                    c.drawCentredString(left + col_width / 2, baseline, text)
+                elif align == 'right':
+                    c.drawRightString(left + col_width - 2 * mm, baseline, text)
+                else:
+                    c.drawString(left + 2 * mm, baseline, text)
+                left += col_width
+            if not header:
+                c.setStrokeColor(HexColor('#eef1f5'))
+                c.line(x, y - row_height, x + width, y - row_height)
+            return y - row_height
+
+        header = [title for title, _, _ in columns]
+        y = draw_row(header, y, fill=self.PRIMARY, header=True)
+
+        items = data.get('items', [])
+        rows = [
+            [
+                item.get('name', ''),
+                item.get('spec') or '-',
+                item.get('quantity', ''),
+                item.get('price', ''),
+                item.get('total', ''),
+                item.get('tax_amount', ''),
+            ]
+            for item in items
+        ]
+        rows += [[''] * len(columns)] * max(self.MIN_ROWS - len(rows), 0)
+
+        for i, row in enumerate(rows):
+            # 페이지를 넘기면 새 페이지에 헤더 행을 다시 그림
+            if y - row_height < bottom:
+                c.showPage()
+                y = draw_row(header, page_height - 15 * mm, fill=self.PRIMARY, header=True)
+            y = draw_row(row, y, fill='#fafbfc' if i % 2 else None)
+
+        # 합계 행
+        c.setStrokeColor(HexColor(self.PRIMARY))
+        c.setLineWidth(1.5)
+        c.line(x, y, x + width, y)
+        c.setLineWidth(1)
+        sum_row = [
+            '합 계', '', data.get('total_quantity', ''), '',
+            f"{data.get('supply_price', '')} 원", f"{data.get('total_tax_amount', '')} 원",
+        ]
+        return draw_row(sum_row, y, fill='#f5f7fa', color=self.PRIMARY)
+
+    def _draw_total_box(self, c, data, x, y, width):
+        height = 12 * mm
+        c.setFillColor(HexColor(self.PRIMARY))
+        c.rect(x, y - height, width, height, stroke=0, fill=1)
+        c.setFillColor(white)
+        amount = f"{data.get('total_amount', '')} 원"
+        c.setFont(self.FONT, 16)
+        c.drawRightString(x + width - 6 * mm, y - 8.2 * mm, amount)
+        amount_width = pdfmetrics.stringWidth(amount, self.FONT, 16)
+        c.setFont(self.FONT, 9)
+        c.drawRightString(x + width - 10 * mm - amount_width, y - 8 * mm, '총 합계 (VAT 포함)')
+
+
+# 템플릿 메타 파일(template/{이름}.meta.json)의 renderer 값 → 렌더러 클래스
+RENDERERS = {
+    'weasyprint': WeasyPrintRenderer,
+    'reportlab': ReportLabRenderer,
+}
 
 
 class EstimatePDFGenerator:
@@ -17,82 +388,85 @@ class EstimatePDFGenerator:
 
     def __init__(self):
         """초기화"""
-        self.templates = {}
+        # 폰트 설정 및 템플릿별 렌더러는 생성기 단위로 재사용
+        self.font_config = FontConfiguration()
+        self.renderers = {}
 
     def load_template(self, template_name):
         """템플릿 로드 (캐싱)"""
-        if template_name not in self.templates:
-            template_path = f'template/{template_name}.html'
-            if not os.path.exists(template_path):
-                raise FileNotFoundError(f"템플릿 파일을 찾을 수 없습니다: {template_path}")
-
-            with open(template_path, 'r', encoding='utf-8') as f:
-                self.templates[template_name] = Template(f.read())
-
-        return self.templates[template_name]
+        # 캐시된 템플릿은 파일 존재 여부를 다시 확인하지 않음
+        try:
+            return _get_environment().get_template(f'{template_name}.html')
+        except TemplateNotFound:
+            raise FileNotFoundError(f"템플릿 파일을 찾을 수 없습니다: {TEMPLATE_DIR / f'{template_name}.html'}") from None
+
+    def _get_renderer(self, template_name):
+        """템플릿별 렌더러 선택 (template/{이름}.meta.json의 renderer 값, 기본값 weasyprint)"""
+        if template_name not in self.renderers:
+            renderer_name = 'weasyprint'
+            meta_path = TEMPLATE_DIR / f'{template_name}.meta.json'
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    renderer_name = json.load(f).get('renderer', renderer_name)
+
+            if renderer_name not in RENDERERS:
+                raise ValueError(f"알 수 없는 렌더러입니다: {renderer_name} ({meta_path})")
+            renderer_class = RENDERERS[renderer_name]
+            if renderer_class is ReportLabRenderer and canvas is None:
+                raise ImportError(f"reportlab 렌더러를 사용하려면 reportlab 패키지를 설치하세요 ({meta_path})")
+
+            if renderer_class is WeasyPrintRenderer:
+                renderer = WeasyPrintRenderer(self.load_template(template_name), self.font_config)
+            else:
+                renderer = renderer_class()
+            self.renderers[template_name] = renderer
+        return self.renderers[template_name]
 
     def load_json(self, json_path):
         """JSON 파일 로드"""
+        if orjson is not None:
+            # orjson은 bytes를 직접 파싱 (UTF-8 디코딩 단계 생략)
+            with open(json_path, 'rb') as f:
+                return orjson.loads(f.read())
+
         with open(json_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-    def generate_items_html(self, items):
-        """품목 리스트를 HTML 테이블 행으로 변환"""
-        rows = []
-        for item in items:
-            row = f"""
-                    <tr>
-                        <td>{item.get('name', '')}</td>
-                        <td>{item.get('quantity', '')}</td>
-                        <td>{item.get('price', '')}</td>
-                        <td>{item.get('total', '')}</td>
-                    </tr>"""
-            rows.append(row)
-        return '\n'.join(rows)
-
-    def calculate_item_total(self, item):
-        """품목의 total 자동 계산 (quantity × price)"""
-        try:
-            quantity = int(str(item.get('quantity', 0)))
-            price_str = str(item.get('price', '0')).replace(',', '')
-            price = int(price_str)
-            total = quantity * price
-            return f"{total:,}"
-        except (ValueError, TypeError):
-            return "0"
-
     def calculate_totals(self, items, tax_rate=0.1):
         """품목 금액 합계 및 세금 자동 계산"""
-        # 각 품목의 total 계산 및 합산
-        supply_price = 0
-        total_tax = 0
         total_quantity = 0
+        item_totals = []
+        parsed = []
 
+        # 1차: 품목별 숫자 변환 (품목당 한 번만 파싱, 변환 실패 시 0원)
         for item in items:
-            # total이 없으면 자동 계산
-            if 'total' not in item or not item['total']:
-                item['total'] = self.calculate_item_total(item)
-
-            # total 값을 숫자로 변환 (콤마 제거)
-            total_str = str(item.get('total', '0')).replace(',', '')
+            total = item.get('total')
             try:
-                item_total = int(total_str)
-                supply_price += item_total
-
-                # 각 품목의 세액 계산
-                item_tax = int(item_total * tax_rate)
-                item['tax_amount'] = f"{item_tax:,}"
-                total_tax += item_tax
-            except ValueError:
-                supply_price += 0
-                item['tax_amount'] = "0"
+                if total:
+                    item_totals.append(_to_int(total))
+                else:
+                    # total이 없으면 자동 계산 (quantity × price)
+                    item_totals.append(_to_int(item.get('quantity', 0)) * _to_int(item.get('price', '0')))
+                parsed.append(True)
+            except (ValueError, TypeError):
+                item_totals.append(0)
+                parsed.append(False)
 
             # 수량 합계
             try:
-                total_quantity += int(str(item.get('quantity', 0)))
-            except ValueError:
+                total_quantity += _to_int(item.get('quantity', 0))
+            except (ValueError, TypeError):
                 pass
 
+        # 금액 합산 및 품목별 세액 계산
+        supply_price, total_tax, item_taxes = _sum_totals(item_totals, tax_rate)
+
+        # 2차: 품목별 total/세액 문자열 포맷
+        for item, item_total, item_tax, ok in zip(items, item_totals, item_taxes, parsed):
+            if not item.get('total'):
+                item['total'] = _fmt(item_total) if ok else "0"
+            item['tax_amount'] = _fmt(item_tax)
+
         # 부가세 계산 (10%)
         tax_amount = int(supply_price * tax_rate)
 
@@ -101,42 +475,32 @@ class EstimatePDFGenerator:
 
         # 천 단위 콤마 포맷
         return {
-            'supply_price': f"{supply_price:,}",
-            'tax_amount': f"{tax_amount:,}",
-            'total_tax_amount': f"{total_tax:,}",
-            'total_amount': f"{total_amount:,}",
+            'supply_price': _fmt(supply_price),
+            'tax_amount': _fmt(tax_amount),
+            'total_tax_amount': _fmt(total_tax),
+            'total_amount': _fmt(total_amount),
             'total_quantity': total_quantity
         }
 
-    def generate_pdf(self, json_path, output_path=None, template_override=None, doc_title='견 적 서'):
-        """JSON 파일로부터 PDF 생성"""
-        # 데이터 로드
-        data = self.load_json(json_path)
-
-        # 템플릿 이름 가져오기
-        if template_override:
-            template_name = template_override
-        else:
-            template_name = 'clean_gradient'  # 기본 템플릿
-
-        # 템플릿 로드
-        template = self.load_template(template_name)
+    def _compute_etag(self, context, renderer_fingerprint, doc_title):
+        """입력 내용 기반 해시 (템플릿 데이터, 렌더러 입력, 문서 제목)"""
+        context_bytes = json.dumps(context, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        key = context_bytes + renderer_fingerprint + doc_title.encode('utf-8')
+        return hashlib.blake2b(key, digest_size=16).hexdigest()
 
-        # 출력 파일명 결정: {JSON파일명}_{템플릿명}_{서류종류}.pdf
+    def get_output_path(self, json_path, template_name, doc_title):
+        """기본 출력 파일명: output/{JSON파일명}_{템플릿명}_{서류종류}.pdf"""
         json_filename = Path(json_path).stem
-        if output_path is None:
-            # doc_title에서 공백 제거하여 파일명으로 사용
-            doc_title_filename = doc_title.replace(' ', '')
-            output_path = f"output/{json_filename}_{template_name}_{doc_title_filename}.pdf"
+        # doc_title에서 공백 제거하여 파일명으로 사용
+        doc_title_filename = doc_title.replace(' ', '')
+        return f"output/{json_filename}_{template_name}_{doc_title_filename}.pdf"
 
-        # output 디렉토리 생성
-        output_dir = os.path.dirname(output_path)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
+    def prepare_context(self, json_path):
+        """JSON 파일로부터 템플릿 데이터 준비 (문서 제목 제외, 서류 종류와 무관하게 한 번만 계산)"""
+        # 데이터 로드
+        data = self.load_json(json_path)
 
         # 템플릿에 전달할 데이터 준비
-        receiver = data.get('receiver', {})
-        supplier = data.get('supplier', {})
         items = data.get('items', [])
 
         # 금액 자동 계산 (JSON에 없는 경우)
@@ -146,14 +510,8 @@ class EstimatePDFGenerator:
         tax_amount = data.get('tax_amount', calculated['tax_amount'])
         total_amount = data.get('total_amount', calculated['total_amount'])
 
-        # items에 total_str 추가
-        for item in items:
-            if 'total_str' not in item:
-                item['total_str'] = item.get('total', '0')
-
-        template_data = {
+        return {
             # 기본 정보
-            'title': doc_title,  # 문서 제목 (함수 파라미터로 전달)
             'doc_number': data.get('doc_number', ''),
             'date': data.get('date', ''),
             'tax': data.get('tax', 10),  # 세율 (%)
@@ -162,39 +520,111 @@ class EstimatePDFGenerator:
             'tax_amount': tax_amount,
             'total_tax_amount': calculated.get('total_tax_amount', tax_amount),
             'total_quantity': calculated.get('total_quantity', 0),
-            # _str 변수들 (템플릿 호환성)
-            'subtotal_str': supply_price,
-            'tax_amount_str': tax_amount,
-            'grand_total_str': total_amount,
-            # estimate1, estimate3 형식 (개별 필드)
-            'receiver_name': receiver.get('name', ''),
-            'receiver_ceo': receiver.get('ceo', ''),
-            'supplier_name': supplier.get('name', ''),
-            'supplier_ceo': supplier.get('ceo', ''),
-            'supplier_reg_id': supplier.get('reg_id', ''),
-            'supplier_address': supplier.get('address', ''),
-            'supplier_contact': supplier.get('contact', ''),
-            'items_rows': self.generate_items_html(items),
-            # estimate2 형식 (객체 전체)
-            'receiver': receiver,
-            'supplier': supplier,
+            # 수신자/공급자/품목 (객체 전체)
+            'receiver': data.get('receiver', {}),
+            'supplier': data.get('supplier', {}),
             'items': items
         }
 
-        # HTML 생성
-        html_content = template.render(**template_data)
+    def render(self, context, template_name, doc_title, output_path):
+        """준비된 템플릿 데이터로 PDF 생성"""
+        return self.render_multi(context, template_name, [doc_title], [output_path])[0]
+
+    def render_multi(self, context, template_name, doc_titles, output_paths):
+        """준비된 템플릿 데이터로 여러 서류(견적서, 거래명세서 등)를 한 번의 렌더링으로 생성"""
+        # 렌더러 로드
+        renderer = self._get_renderer(template_name)
+        fingerprint = renderer.fingerprint()
+
+        # 입력(데이터, 렌더러 입력, 제목)이 이전 생성 시와 같은 서류는 건너뜀
+        pending = []
+        for doc_title, output_path in zip(doc_titles, output_paths):
+            etag = self._compute_etag(context, fingerprint, doc_title)
+            etag_path = f"{output_path}.etag"
+            try:
+                with open(etag_path, 'r', encoding='utf-8') as f:
+                    unchanged = f.read() == etag
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged and os.path.exists(output_path):
+                print(f"- 변경 없음, 건너뜀: {output_path}")
+            else:
+                pending.append((doc_title, output_path, etag_path, etag))
+
+        if pending:
+            # 문서 제목은 함수 파라미터로 전달
+            renderer.render_many(
+                [dict(context, title=doc_title) for doc_title, _, _, _ in pending],
+                [output_path for _, output_path, _, _ in pending],
+            )
+            for _, output_path, etag_path, etag in pending:
+                with open(etag_path, 'w', encoding='utf-8') as f:
+                    f.write(etag)
+                print(f"✓ PDF 생성 완료: {output_path} (템플릿: {template_name})")
+
+        return list(output_paths)
+
+    def generate_pdf(self, json_path, output_path=None, template_override=None, doc_title='견 적 서'):
+        """JSON 파일로부터 PDF 생성"""
+        # 템플릿 이름 가져오기
+        if template_override:
+            template_name = template_override
+        else:
+            template_name = 'clean_gradient'  # 기본 템플릿
+
+        if output_path is None:
+            output_path = self.get_output_path(json_path, template_name, doc_title)
+
+        # output 디렉토리 생성 (일괄 처리 시에는 main()에서 한 번만 생성)
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        context = self.prepare_context(json_path)
+        return self.render(context, template_name, doc_title, output_path)
+
+    def generate_pdf_multi(self, json_path, template_override=None, doc_titles=None):
+        """JSON 파일로부터 여러 서류 PDF를 한 번의 렌더링으로 생성"""
+        template_name = template_override or 'clean_gradient'  # 기본 템플릿
+        doc_titles = doc_titles or DOC_TITLES
+        output_paths = [self.get_output_path(json_path, template_name, doc_title) for doc_title in doc_titles]
+
+        # output 디렉토리 생성
+        Path('output').mkdir(exist_ok=True)
+
+        context = self.prepare_context(json_path)
+        return self.render_multi(context, template_name, doc_titles, output_paths)
+
+
+# 워커 프로세스별 생성기 (템플릿 캐시를 프로세스 내에서 재사용)
+_worker_generator = None
+
+
+def _render_one(context, template_name, doc_types, output_paths):
+    """워커 프로세스에서 한 템플릿의 서류 PDF들 생성 (성공 여부, 메시지) 반환"""
+    global _worker_generator
+    try:
+        if _worker_generator is None:
+            _worker_generator = EstimatePDFGenerator()
+        _worker_generator.render_multi(context, template_name, doc_types, output_paths)
+        return True, output_paths
+    except Exception as e:
+        return False, f"✗ 오류 발생 ({Path(output_paths[0]).name} - {template_name}): {e}\n{traceback.format_exc()}"
 
-        # PDF로 직접 변환 (HTML 파일 저장 안 함)
-        html = HTML(string=html_content)
-        html.write_pdf(output_path)
-        print(f"✓ PDF 생성 완료: {output_path} (템플릿: {template_name})")
 
-        return output_path
+def warm_templates():
+    """사용 가능한 모든 템플릿을 미리 컴파일 (바이트코드 캐시 및 프로세스 내 캐시 채움)"""
+    for template_name in get_available_templates():
+        try:
+            _get_environment().get_template(f'{template_name}.html')
+        except Exception:
+            # 컴파일 오류는 해당 템플릿의 작업(_render_one)에서 다시 발생하여 보고됨
+            pass
 
 
 def get_available_templates():
     """사용 가능한 템플릿 목록 가져오기"""
-    template_dir = Path('template')
+    template_dir = TEMPLATE_DIR
     if not template_dir.exists():
         return []
 
@@ -250,14 +680,10 @@ def select_template():
 
 def main():
     """메인 함수"""
-    try:
-        generator = EstimatePDFGenerator()
-    except FileNotFoundError as e:
-        print(f"오류: {e}")
-        return
-
-    # 템플릿 선택
+    # 템플릿 선택 (취소되었거나 템플릿이 없으면 종료)
     selected_template = select_template()
+    if selected_template is None:
+        return
 
     # data 디렉토리의 모든 JSON 파일 처리
     data_dir = Path('data')
@@ -272,35 +698,49 @@ def main():
         print("오류: data 디렉토리에 JSON 파일이 없습니다.")
         return
 
-    # 문서 타입 목록 (견적서, 거래명세서)
-    doc_types = ['견 적 서', '거 래 명 세 서']
-
     # 모든 템플릿으로 생성하는 경우
     if selected_template == 'all':
         available_templates = get_available_templates()
         print(f"총 {len(json_files)}개의 데이터를 {len(available_templates)}개 템플릿으로, 2가지 서류 형식(견적서, 거래명세서)으로 처리합니다.\n")
-
-        for json_file in json_files:
-            for template in available_templates:
-                for doc_type in doc_types:
-                    try:
-                        generator.generate_pdf(str(json_file), template_override=template, doc_title=doc_type)
-                    except Exception as e:
-                        print(f"✗ 오류 발생 ({json_file.name} - {template} - {doc_type}): {e}")
-                        import traceback
-                        traceback.print_exc()
     else:
         # 특정 템플릿만 선택한 경우
+        available_templates = [selected_template]
         print(f"총 {len(json_files)}개의 데이터를 2가지 서류 형식(견적서, 거래명세서)으로 처리합니다.\n")
 
-        for json_file in json_files:
-            for doc_type in doc_types:
-                try:
-                    generator.generate_pdf(str(json_file), template_override=selected_template, doc_title=doc_type)
-                except Exception as e:
-                    print(f"✗ 오류 발생 ({json_file.name} - {doc_type}): {e}")
-                    import traceback
-                    traceback.print_exc()
+    # output 디렉토리는 시작 시 한 번만 생성
+    Path('output').mkdir(exist_ok=True)
+
+    # 풀 생성 전에 템플릿을 컴파일해 두면 fork된 워커는 그대로 물려받고,
+    # spawn 방식 워커는 시작 시(initializer) 바이트코드 캐시에서 로드
+    warm_templates()
+
+    # JSON 파싱 및 금액 계산은 파일당 한 번만 수행하며, 여러 파일을 스레드로 동시에 읽음
+    # (스레드가 도는 중에 워커를 fork하면 교착될 수 있으므로 프로세스 풀 생성 전에 모두 완료)
+    generator = EstimatePDFGenerator()
+    contexts = []
+    with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as prefetcher:
+        loading = {prefetcher.submit(generator.prepare_context, str(json_file)): json_file for json_file in json_files}
+        for loaded in as_completed(loading):
+            json_file = loading[loaded]
+            try:
+                contexts.append((json_file, loaded.result()))
+            except Exception as e:
+                print(f"✗ 오류 발생 ({json_file.name}): {e}")
+                traceback.print_exc()
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=warm_templates) as executor:
+        # (JSON, 템플릿) 조합마다 독립적인 작업이므로 프로세스 풀에서 병렬 처리
+        # 서류 종류(견적서, 거래명세서)는 한 작업에서 한 번의 렌더링으로 함께 생성
+        futures = []
+        for json_file, context in contexts:
+            for template in available_templates:
+                output_paths = [generator.get_output_path(str(json_file), template, doc_type) for doc_type in DOC_TITLES]
+                futures.append(executor.submit(_render_one, context, template, DOC_TITLES, output_paths))
+
+        for future in as_completed(futures):
+            ok, msg = future.result()
+            if not ok:
+                print(msg)
 
     print(f"\n모든 PDF 파일이 output 디렉토리에 생성되었습니다.")
 